@@ -1,15 +1,79 @@
 import os
-from flask import Flask
+from threading import Lock
+from cachetools import TTLCache
+from flask import Flask, current_app
+from flask_login import user_logged_out
 from dotenv import load_dotenv
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy.orm import load_only, make_transient_to_detached, raiseload
 from .extensions import db, login_manager, migrate, limiter
 from .models import User
 from .helpers import highlight, reading_time, tags_contains_draft
-from .config import DevelopmentConfig, TestingConfig, ProductionConfig
+from .config import DevelopmentConfig, TestingConfig, ProductionConfig, engine_options
+
+_CONFIGS = {
+    "DevelopmentConfig": DevelopmentConfig,
+    "TestingConfig": TestingConfig,
+    "ProductionConfig": ProductionConfig,
+}
+
+
+class _TTLStore:
+    """Thread-safe TTL cache shared by a worker's request threads."""
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._data = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class _HealthzMiddleware:
+    """Answers the /healthz liveness probe before Flask routing, hooks and sessions run."""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        if environ.get("PATH_INFO") == "/healthz":
+            start_response("200 OK", [("Content-Type", "text/plain"), ("Content-Length", "2")])
+            return [b"ok"]
+        return self.wsgi_app(environ, start_response)
 
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    user_id = int(user_id)
+    # Holds plain field dicts rather than ORM instances so nothing is shared between sessions
+    cache = current_app.extensions["user_cache"]
+    fields = cache.get(user_id)
+    if fields is not None:
+        # Attach a copy to this request's session without emitting a SELECT
+        user = User(**fields)
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+    # Identity-map aware PK lookup of just the cached fields (no password_hash);
+    # any lazy load of a relationship off the user becomes an error
+    user = db.session.get(
+        User, user_id, options=[load_only(User.id, User.email, User.is_admin), raiseload("*")]
+    )
+    if user is not None:
+        cache.set(user_id, {"id": user.id, "email": user.email, "is_admin": user.is_admin})
+    return user
+
+
+def _forget_user(sender, user, **extra):
+    current_app.extensions["user_cache"].discard(user.id)
 
 
 def create_app():
@@ -29,12 +93,11 @@ def create_app():
         cfg_name = (
             "ProductionConfig" if os.getenv("FLASK_ENV") == "production" else "DevelopmentConfig"
         )
-    mapping = {
-        "DevelopmentConfig": DevelopmentConfig,
-        "TestingConfig": TestingConfig,
-        "ProductionConfig": ProductionConfig,
-    }
-    app.config.from_object(mapping.get(cfg_name, DevelopmentConfig))
+    app.config.from_object(_CONFIGS.get(cfg_name, DevelopmentConfig))
+
+    app.config.setdefault(
+        "SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
+    )
 
     # Init extensions
     db.init_app(app)
@@ -42,12 +105,25 @@ def create_app():
     login_manager.login_view = "auth.login"
     login_manager.login_message_category = "warning"
     migrate.init_app(app, db)
+    app.extensions["user_cache"] = _TTLStore(1024, app.config["USER_CACHE_TTL"])
+    if app.config["PAGE_CACHE_TTL"] > 0:
+        app.extensions["page_cache"] = _TTLStore(256, app.config["PAGE_CACHE_TTL"])
+    user_logged_out.connect(_forget_user, app)
     limiter.init_app(app)
 
     # Jinja filters and globals
     app.jinja_env.filters["highlight"] = highlight
     app.jinja_env.filters["reading_time"] = reading_time
     app.jinja_env.globals["is_draft"] = tags_contains_draft
+    if app.config.get("JINJA_BYTECODE_CACHE"):
+        bytecode_dir = app.config.get("JINJA_BYTECODE_CACHE_DIR")
+        if bytecode_dir:
+            os.makedirs(bytecode_dir, mode=0o700, exist_ok=True)
+        # None selects Jinja's owner-checked per-user default directory
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(bytecode_dir)
+    if app.config.get("JINJA_PREWARM"):
+        for name in app.jinja_env.list_templates(extensions=["html"]):
+            app.jinja_env.get_template(name)
 
     # Canonical URL helper
     @app.context_processor
@@ -75,6 +151,8 @@ def create_app():
     app.register_blueprint(auth_bp)
     app.register_blueprint(admin_bp)
 
+    app.wsgi_app = _HealthzMiddleware(app.wsgi_app)
+
     # Error handlers
     @app.errorhandler(404)
     def handle_404(e):
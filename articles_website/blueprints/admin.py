@@ -1,12 +1,39 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, Response
+from sqlalchemy.exc import IntegrityError
 from ..forms import ArticleForm
 from ..models import Article
 from ..extensions import db, limiter
-from ..helpers import admin_required, unique_slug, normalize_tags, render_markdown_safe
+from ..helpers import (
+    admin_required,
+    unique_slug,
+    normalize_tags,
+    render_markdown_safe,
+    render_body,
+    sync_tags,
+)
 
 bp = Blueprint("admin", __name__)
 
 
+def _add_with_unique_slug(article: Article, attempts: int = 3) -> None:
+    """Insert article, re-picking its slug if a concurrent insert claimed it first.
+
+    The INSERT runs inside a SAVEPOINT so a unique violation can be retried
+    without abandoning the surrounding transaction. Tags are linked after the
+    add, once the article is in the session the Tag rows belong to.
+    """
+    for attempt in range(attempts):
+        try:
+            with db.session.begin_nested():
+                db.session.add(article)
+                sync_tags(article)
+            return
+        except IntegrityError:
+            if attempt == attempts - 1:
+                raise
+            article.slug = unique_slug(article.title)
+
+
 @bp.route("/create", methods=["GET", "POST"])
 @admin_required
 def create():
@@ -18,7 +45,8 @@ def create():
             tags=normalize_tags(form.tags.data),
         )
         article.slug = unique_slug(article.title)
-        db.session.add(article)
+        render_body(article)
+        _add_with_unique_slug(article)
         db.session.commit()
         flash("Article created!", "success")
         return redirect(url_for("main.article_by_slug", slug=article.slug))
@@ -28,14 +56,20 @@ def create():
 @bp.route("/edit/<int:article_id>", methods=["GET", "POST"])
 @admin_required
 def edit(article_id):
-    article = Article.query.get_or_404(article_id)
+    article = db.get_or_404(Article, article_id)
     form = ArticleForm(obj=article)
     if form.validate_on_submit():
         new_title = form.title.data.strip()
+        if new_title != article.title:
+            article.slug = unique_slug(new_title, existing_id=article.id)
         article.title = new_title
         article.tags = normalize_tags(form.tags.data)
-        article.body = form.body.data.strip()
-        article.slug = unique_slug(new_title, existing_id=article.id)
+        new_body = form.body.data.strip()
+        # Rendering (Markdown + Pygments) is the slow part of a save; skip it for title/tag edits
+        if new_body != article.body or article.body_html is None:
+            article.body = new_body
+            render_body(article)
+        sync_tags(article)
         db.session.commit()
         flash("Article updated!", "success")
         return redirect(url_for("main.article_by_slug", slug=article.slug))
@@ -45,7 +79,7 @@ def edit(article_id):
 @bp.route("/delete/<int:article_id>", methods=["POST"])
 @admin_required
 def delete(article_id):
-    article = Article.query.get_or_404(article_id)
+    article = db.get_or_404(Article, article_id)
     db.session.delete(article)
     db.session.commit()
     flash("Deleted.", "info")
@@ -1,5 +1,7 @@
 from flask import Blueprint, render_template, redirect, url_for, request, flash
 from flask_login import current_user, login_user, logout_user, login_required
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from ..forms import RegisterForm, LoginForm
 from ..models import User
 from ..extensions import db, limiter
@@ -14,13 +16,16 @@ def register():
         return redirect(url_for("main.articles"))
     form = RegisterForm()
     if form.validate_on_submit():
-        if User.query.filter_by(email=form.email.data.lower()).first():
-            flash("Email is already registered.", "danger")
-            return redirect(url_for("auth.register"))
         user = User(email=form.email.data.lower())
         user.set_password(form.password.data)
         db.session.add(user)
-        db.session.commit()
+        try:
+            # The unique lower(email) index rejects duplicates; no pre-check SELECT needed
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            flash("Email is already registered.", "danger")
+            return redirect(url_for("auth.register"))
         login_user(user)
         flash("Welcome! Account created.", "success")
         return redirect(url_for("main.articles"))
@@ -34,10 +39,17 @@ def login():
         return redirect(url_for("main.articles"))
     form = LoginForm()
     if form.validate_on_submit():
-        user = User.query.filter_by(email=form.email.data.lower()).first()
-        if not user or not user.check_password(form.password.data):
+        user = User.query.filter(func.lower(User.email) == form.email.data.lower()).first()
+        if user is None:
+            ok = User.check_missing_password(form.password.data)
+        else:
+            ok = user.check_password(form.password.data)
+        if not ok:
             flash("Invalid email or password.", "danger")
             return redirect(url_for("auth.login"))
+        if user.password_needs_rehash():
+            user.set_password(form.password.data)
+            db.session.commit()
         login_user(user, remember=form.remember.data)
         flash("Logged in.", "success")
         next_url = request.args.get("next")
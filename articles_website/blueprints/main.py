@@ -1,142 +1,312 @@
-from flask import Blueprint, render_template, request, current_app, url_for, Response, jsonify
-from ..models import Article
-from sqlalchemy import or_
-from ..helpers import render_markdown_safe, tags_contains_draft
-from ..extensions import limiter
+import hashlib
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import urlencode
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape as xml_escape
+from flask import (
+    Blueprint,
+    render_template,
+    stream_template,
+    request,
+    session,
+    current_app,
+    url_for,
+    make_response,
+    Response,
+    abort,
+    jsonify,
+    stream_with_context,
+    get_flashed_messages,
+)
+from flask_login import current_user
+from ..models import Article, ListingVersion, Tag, article_tags
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import load_only
+from ..helpers import escape_like, render_body, tags_contains_draft
+from ..extensions import db, limiter
 
 bp = Blueprint("main", __name__)
 
+# Columns the article cards render; keeps the large body/body_html out of listing queries
+_CARD_FIELDS = (Article.id, Article.title, Article.slug, Article.tags, Article.word_count)
+_CARD_COLUMNS = load_only(*_CARD_FIELDS)
+# Search cards also show a preview
+_SEARCH_CARD_COLUMNS = load_only(*_CARD_FIELDS, Article.body_excerpt)
+# Columns article_detail.html renders
+_DETAIL_FIELDS = (
+    Article.id,
+    Article.title,
+    Article.slug,
+    Article.tags,
+    Article.body_html,
+    Article.word_count,
+    Article.updated_at,
+)
+# Exact "draft" tag match through the indexed tag tables (a substring match hid "drafting" too)
+_PUBLISHED = ~Article.tags_rel.any(Tag.name == "draft")
+
+
+def _etag(*parts) -> str:
+    """ETag over the given parts plus the viewer, since pages render admin-only controls."""
+    viewer = current_user.get_id() if current_user.is_authenticated else "anon"
+    key = "|".join(str(p) for p in (*parts, viewer))
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def _with_etag(resp: Response, etag: str, last_modified: Optional[datetime] = None) -> Response:
+    resp.set_etag(etag)
+    if last_modified is not None:
+        resp.last_modified = _as_http_date(last_modified)
+    # Per-viewer content: let browsers keep it, but revalidate every time
+    resp.cache_control.private = True
+    resp.cache_control.no_cache = True
+    return resp
+
+
+def _as_http_date(value: datetime) -> datetime:
+    # Stored timestamps are naive UTC; HTTP dates have whole-second precision
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def _not_modified(etag: str, last_modified: Optional[datetime] = None):
+    """Return a 304 if the client already holds `etag` (or, for clients that only
+    send If-Modified-Since, a copy at least as new as `last_modified`), else None.
+
+    Never answers 304 while a flash is pending, or the message would not be shown.
+    """
+    if "_flashes" in session:
+        return None
+    if request.if_none_match:
+        fresh = request.if_none_match.contains(etag)
+    else:
+        since = request.if_modified_since
+        fresh = (
+            last_modified is not None
+            and since is not None
+            and (_as_http_date(last_modified) <= since)
+        )
+    if not fresh:
+        return None
+    return _with_etag(Response(status=304), etag, last_modified)
+
+
+def _seek_page(query, per_page: int):
+    """Keyset page of `query` (ordered by id DESC) following the ?after_id= cursor.
+
+    Fetches one extra row to learn whether an older page exists, so there is no
+    COUNT(*) and no OFFSET. Old ?page=N links still land on the right page via a
+    one-off OFFSET; the links they get back are cursors. Returns (items, pager)
+    where pager holds the template's next_url/first_url links.
+    """
+    per_page = max(1, per_page)
+    after_id = request.args.get("after_id", type=int)
+    page = request.args.get("page", 1, type=int)
+    if after_id:
+        query = query.filter(Article.id < after_id)
+    elif page > 1:
+        query = query.offset((page - 1) * per_page)
+    items = query.limit(per_page + 1).all()
+    has_next = len(items) > per_page
+    items = items[:per_page]
+
+    def _url(**changes):
+        # Query args go into the query string, never into url_for() as keywords, where
+        # they could collide with view args ("tag") or reserved names ("_external")
+        args = {k: v for k, v in request.args.items() if k not in ("after_id", "partial", "page")}
+        args.update(changes)
+        base = url_for(request.endpoint, **request.view_args)
+        return f"{base}?{urlencode(args)}" if args else base
+
+    pager = {
+        "next_url": _url(after_id=items[-1].id) if has_next else None,
+        "first_url": _url() if after_id or page > 1 else None,
+    }
+    return items, pager
+
+
+def _cached_page(key, render, per_viewer: bool = True):
+    """Return render()'s output, reused from the worker's page cache.
+
+    Callers fold the listing version into `key`, so article writes take effect
+    without explicit invalidation. Unless `per_viewer` is False (output that is
+    the same for everyone, like the XML feeds), logged-in pages and pages
+    carrying a flash are always rendered fresh.
+    """
+    cache = current_app.extensions.get("page_cache")
+    if cache is None or (per_viewer and (current_user.is_authenticated or "_flashes" in session)):
+        return render()
+    key = (request.url, *key)
+    html = cache.get(key)
+    if html is None:
+        html = render()
+        cache.set(key, html)
+    return html
+
+
+def _paginated_article_response(query, **context):
+    """Keyset page of `query` as the article listing, or the card fragment for HTMX.
+
+    Shared by articles, by_tag and search. The ETag and the anonymous page cache
+    key on the URL (path, cursor, filters), the fragment flag and the listing
+    version, so a 304 or a cache hit skips both the query and the render.
+    """
+    per_page_default = current_app.config.get("ARTICLES_PER_PAGE", 10)
+    per_page = request.args.get("per_page", default=per_page_default, type=int)
+    partial = request.args.get("partial") == "1" or bool(request.headers.get("HX-Request"))
+
+    etag = _etag(request.full_path, partial, *_listing_version())
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    def render():
+        items, pager = _seek_page(query, per_page)
+        # Partial fragment for infinite scroll
+        template = "partials/_article_cards.html" if partial else "articles.html"
+        return render_template(template, items=items, **context, **pager)
+
+    return _with_etag(make_response(_cached_page((etag,), render)), etag)
+
+
+def _search_filter(q: str):
+    """Title/body substring match; on Postgres titles also match fuzzily via pg_trgm's `%`.
+
+    Both forms are served by the trigram GIN indexes; `%` uses the server's
+    pg_trgm.similarity_threshold (0.3 by default).
+    """
+    # The user's "%" and "_" are literal characters, not wildcards
+    pattern = f"%{escape_like(q)}%"
+    clauses = [
+        Article.title.ilike(pattern, escape="\\"),
+        Article.body.ilike(pattern, escape="\\"),
+    ]
+    if db.engine.dialect.name == "postgresql":
+        clauses.append(Article.title.op("%")(q))
+    return or_(*clauses)
+
+
+def _cached_stream(key, chunks):
+    """Yield the output of the chunks() generator, or its cached copy from an earlier pass.
+
+    Output shared by every viewer only; `key` carries the listing version as in
+    _cached_page. A complete pass stores the joined text for the next request.
+    """
+    cache = current_app.extensions.get("page_cache")
+    key = (request.url, *key)
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        yield cached
+        return
+    parts = []
+    for chunk in chunks():
+        parts.append(chunk)
+        yield chunk
+    if cache is not None:
+        cache.set(key, "".join(parts))
+
+
+def _listing_version():
+    """(version, bumped at) of the ListingVersion row: changes on every create, edit and delete."""
+    return db.session.execute(select(ListingVersion.version, ListingVersion.updated_at)).one()
+
 
 @bp.route("/")
 def home():
-    latest = (
-        Article.query.filter(~Article.tags.ilike("%draft%") | (Article.tags == None))
-        .order_by(Article.id.desc())
-        .limit(5)
-        .all()
-    )
-    return render_template("home.html", latest=latest)
+    etag = _etag("home", *_listing_version())
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    def render():
+        latest = (
+            Article.query.options(_CARD_COLUMNS)
+            .filter(_PUBLISHED)
+            .order_by(Article.id.desc())
+            .limit(5)
+            .all()
+        )
+        return render_template("home.html", latest=latest)
+
+    return _with_etag(make_response(_cached_page((etag,), render)), etag)
 
 
 @bp.route("/about")
 @limiter.exempt
 def about():
-    return render_template("about.html")
+    return _cached_page(("about",), lambda: render_template("about.html"))
 
 
 @bp.route("/tags")
 @limiter.exempt
 def tags_index():
-    # Build tag list with counts (simple scan; OK for small dataset)
-    rows = Article.query.with_entities(Article.tags).all()
-    counts = {}
-    for (tagstr,) in rows:
-        if not tagstr:
-            continue
-        for raw in tagstr.split(","):
-            t = raw.strip().lower()
-            if not t or t == "draft":
-                continue
-            counts[t] = counts.get(t, 0) + 1
-    tags = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    # Tag list with counts, grouped in SQL over the normalized (tag_id-indexed) link table
+    uses = func.count(article_tags.c.article_id)
+    tags = (
+        db.session.query(Tag.name, uses)
+        .join(article_tags, article_tags.c.tag_id == Tag.id)
+        .filter(Tag.name != "draft")
+        .group_by(Tag.name)
+        .order_by(uses.desc(), Tag.name)
+        .all()
+    )
     return render_template("tags.html", tags=tags)
 
 
 @bp.route("/articles")
 @limiter.limit("120/minute")
 def articles():
-    # Pagination
-    page = request.args.get("page", default=1, type=int)
-    per_page_default = current_app.config.get("ARTICLES_PER_PAGE", 10)
-    per_page = request.args.get("per_page", default=per_page_default, type=int)
-
-    query = (
-        Article.query
-        .filter(~Article.tags.ilike("%draft%") | (Article.tags == None))
-        .order_by(Article.id.desc())
-    )
-    total = query.count()
-    items = query.offset((page - 1) * per_page).limit(per_page).all()
-
-    has_prev = page > 1
-    has_next = page * per_page < total
-
-    # Partial fragment for infinite scroll
-    if request.args.get("partial") == "1" or request.headers.get("HX-Request"):
-        return render_template(
-            "partials/_article_cards.html",
-            items=items,
-            q=None,
-            active_tag=None,
-        )
-
-    return render_template(
-        "articles.html",
-        items=items,
-        page=page,
-        per_page=per_page,
-        total=total,
-        has_prev=has_prev,
-        has_next=has_next,
-    )
+    query = Article.query.options(_CARD_COLUMNS).filter(_PUBLISHED).order_by(Article.id.desc())
+    return _paginated_article_response(query)
 
 
 @bp.route("/a/<slug>")
 @limiter.limit("120/minute")
 def article_by_slug(slug):
-    article = Article.query.filter_by(slug=slug).first_or_404()
-    article.body_html = render_markdown_safe(article.body)
-    return render_template("article_detail.html", article=article)
+    # Read-only page: a plain Row of the columns the template shows, no ORM instance
+    article = db.session.execute(select(*_DETAIL_FIELDS).where(Article.slug == slug)).first()
+    if article is None:
+        abort(404)
+    etag = _etag(article.id, article.updated_at.isoformat())
+    not_modified = _not_modified(etag, article.updated_at)
+    if not_modified:
+        return not_modified
+    if article.body_html is None:
+        # Legacy row saved before body_html existed: render once and persist
+        article = db.session.get(Article, article.id)
+        render_body(article)
+        db.session.commit()
+    # The session is saved before a streamed body renders, so pop flashes now;
+    # the template's get_flashed_messages() then reads the request-cached copy
+    get_flashed_messages()
+    resp = current_app.response_class(stream_template("article_detail.html", article=article))
+    return _with_etag(resp, etag, article.updated_at)
 
 
 @bp.route("/article/<int:article_id>")
 @limiter.limit("120/minute")
 def article_detail(article_id):
-    article = Article.query.get_or_404(article_id)
+    # Only the slug is needed for the redirect; don't hydrate the whole row
+    slug = db.session.query(Article.slug).filter_by(id=article_id).scalar()
+    if slug is None:
+        abort(404)
     # keep redirect to slug URL behavior identical
     from flask import redirect
 
-    return redirect(url_for("main.article_by_slug", slug=article.slug or article.id))
+    return redirect(url_for("main.article_by_slug", slug=slug))
 
 
 @bp.route("/tags/<tag>")
 @limiter.limit("120/minute")
 def by_tag(tag):
-    # Add pagination for tag-filtered listing
-    page = request.args.get("page", default=1, type=int)
-    per_page_default = current_app.config.get("ARTICLES_PER_PAGE", 10)
-    per_page = request.args.get("per_page", default=per_page_default, type=int)
-
     query = (
-        Article.query.filter(Article.tags.ilike(f"%{tag}%"))
-        .filter(~Article.tags.ilike("%draft%") | (Article.tags == None))
+        Article.query.options(_CARD_COLUMNS)
+        .join(Article.tags_rel)
+        .filter(Tag.name == tag.strip().lower())
+        .filter(_PUBLISHED)
         .order_by(Article.id.desc())
     )
-    total = query.count()
-    items = query.offset((page - 1) * per_page).limit(per_page).all()
-
-    has_prev = page > 1
-    has_next = page * per_page < total
-
-    # Partial fragment for infinite scroll
-    if request.args.get("partial") == "1" or request.headers.get("HX-Request"):
-        return render_template(
-            "partials/_article_cards.html",
-            items=items,
-            q=None,
-            active_tag=tag,
-        )
-
-    return render_template(
-        "articles.html",
-        items=items,
-        page=page,
-        per_page=per_page,
-        total=total,
-        has_prev=has_prev,
-        has_next=has_next,
-        active_tag=tag,
-    )
+    return _paginated_article_response(query, active_tag=tag)
 
 
 @bp.route("/search")
@@ -146,47 +316,16 @@ def search():
     q = (request.args.get("q", "") or "").strip()
     if not q:
         from flask import redirect
-        return redirect(url_for("main.articles"))
 
-    page = request.args.get("page", default=1, type=int)
-    per_page_default = current_app.config.get("ARTICLES_PER_PAGE", 10)
-    per_page = request.args.get("per_page", default=per_page_default, type=int)
+        return redirect(url_for("main.articles"))
 
     query = (
-        Article.query.filter(
-            or_(
-                Article.title.ilike(f"%{q}%"),
-                Article.body.ilike(f"%{q}%"),
-            )
-        )
-        .filter(~Article.tags.ilike("%draft%") | (Article.tags == None))
+        Article.query.options(_SEARCH_CARD_COLUMNS)
+        .filter(_search_filter(q))
+        .filter(_PUBLISHED)
         .order_by(Article.id.desc())
     )
-    total = query.count()
-    items = query.offset((page - 1) * per_page).limit(per_page).all()
-
-    has_prev = page > 1
-    has_next = page * per_page < total
-
-    # Partial fragment for infinite scroll
-    if request.args.get("partial") == "1" or request.headers.get("HX-Request"):
-        return render_template(
-            "partials/_article_cards.html",
-            items=items,
-            q=q,
-            active_tag=None,
-        )
-
-    return render_template(
-        "articles.html",
-        items=items,
-        page=page,
-        per_page=per_page,
-        total=total,
-        has_prev=has_prev,
-        has_next=has_next,
-        q=q,
-    )
+    return _paginated_article_response(query, q=q)
 
 
 @bp.get("/search/suggest")
@@ -196,16 +335,29 @@ def search_suggest():
     q = (request.args.get("q", "") or "").strip()
     if not q:
         return render_template("partials/_suggestions.html", suggestions=[], q=q)
-    suggestions = (
-        Article.query.filter(
-            or_(Article.title.ilike(f"%{q}%"), Article.body.ilike(f"%{q}%"))
+
+    def render():
+        order = [Article.id.desc()]
+        if db.engine.dialect.name == "postgresql":
+            # Closest titles first, so a typo still surfaces the intended article
+            order.insert(0, func.similarity(Article.title, q).desc())
+        suggestions = (
+            Article.query.options(load_only(Article.title, Article.slug))
+            .filter(_search_filter(q))
+            .filter(_PUBLISHED)
+            .order_by(*order)
+            .limit(5)
+            .all()
         )
-        .filter(~Article.tags.ilike("%draft%") | (Article.tags == None))
-        .order_by(Article.id.desc())
-        .limit(5)
-        .all()
-    )
-    return render_template("partials/_suggestions.html", suggestions=suggestions, q=q)
+        return render_template("partials/_suggestions.html", suggestions=suggestions, q=q)
+
+    # Fired on every keystroke: repeated queries skip the ILIKE scan, and the
+    # browser reuses an answer for the same text for a short while
+    html = _cached_page(("suggest", *_listing_version()), render, per_viewer=False)
+    resp = make_response(html)
+    resp.cache_control.public = True
+    resp.cache_control.max_age = 30
+    return resp
 
 
 @bp.route("/robots.txt")
@@ -222,67 +374,71 @@ Sitemap: {sitemap_url}
 @bp.route("/sitemap.xml")
 @limiter.limit("30/minute")
 def sitemap():
-    # Build a simple sitemap including key pages and all article slugs
-    urls = [
-        url_for("main.home", _external=True),
-        url_for("main.articles", _external=True),
-        url_for("main.about", _external=True),
-        url_for("main.tags_index", _external=True),
-    ]
-    for (slug,) in Article.query.with_entities(Article.slug).order_by(Article.id.desc()).all():
-        urls.append(url_for("main.article_by_slug", slug=slug, _external=True))
-
-    xml_parts = [
-        "<?xml version=\"1.0\" encoding=\"UTF-8\"?>",
-        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
-    ]
-    for u in urls:
-        xml_parts.append(f"  <url><loc>{u}</loc></url>")
-    xml_parts.append("</urlset>")
-
-    return Response("\n".join(xml_parts), mimetype="application/xml")
+    version = _listing_version()
+    etag = _etag("sitemap", *version)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+    chunks = _cached_stream(("sitemap", *version), _sitemap_chunks)
+    return _with_etag(Response(stream_with_context(chunks), mimetype="application/xml"), etag)
+
+
+def _sitemap_chunks():
+    # Simple sitemap of the key pages and all article slugs, one line per chunk
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for endpoint in ("main.home", "main.articles", "main.about", "main.tags_index"):
+        yield f"  <url><loc>{xml_escape(url_for(endpoint, _external=True))}</loc></url>\n"
+    # Slugs arrive in batches from the cursor instead of one list of every row; lines
+    # are written by hand (escaped) so the document never has to be built whole
+    slugs = db.session.execute(
+        select(Article.slug).order_by(Article.id.desc()).execution_options(yield_per=500)
+    ).scalars()
+    for slug in slugs:
+        loc = url_for("main.article_by_slug", slug=slug, _external=True)
+        yield f"  <url><loc>{xml_escape(loc)}</loc></url>\n"
+    yield "</urlset>"
 
 
 @bp.route("/feed.xml")
 @limiter.limit("30/minute")
 def feed():
-    # Simple RSS 2.0 feed with latest 20 articles
-    items = (
-        Article.query
-        .filter(~Article.tags.ilike("%draft%") | (Article.tags == None))
+    version = _listing_version()
+    etag = _etag("feed", *version)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+    xml = _cached_page(("feed", *version), _render_feed, per_viewer=False)
+    return _with_etag(Response(xml, mimetype="application/rss+xml"), etag)
+
+
+def _render_feed() -> bytes:
+    # Simple RSS 2.0 feed with latest 20 articles, built with ElementTree so titles
+    # and descriptions are escaped properly
+    # One character past the 200 shown tells whether the body was cut, without
+    # shipping whole bodies out of the database
+    items = db.session.execute(
+        select(Article.title, Article.slug, func.substr(Article.body, 1, 201).label("snippet"))
+        .where(_PUBLISHED)
         .order_by(Article.id.desc())
         .limit(20)
-        .all()
-    )
-    site_url = url_for("main.home", _external=True)
-    xml_parts = [
-        "<?xml version=\"1.0\" encoding=\"UTF-8\"?>",
-        "<rss version=\"2.0\">",
-        "<channel>",
-        f"  <title>Articles Feed</title>",
-        f"  <link>{site_url}</link>",
-        f"  <description>Latest articles</description>",
-    ]
+    ).all()
+    rss = ET.Element("rss", version="2.0")
+    channel = ET.SubElement(rss, "channel")
+    ET.SubElement(channel, "title").text = "Articles Feed"
+    ET.SubElement(channel, "link").text = url_for("main.home", _external=True)
+    ET.SubElement(channel, "description").text = "Latest articles"
     for a in items:
         link = url_for("main.article_by_slug", slug=a.slug, _external=True)
-        title = a.title
-        desc = (a.body[:200] + ("..." if len(a.body) > 200 else "")).replace("&", "&amp;")
-        xml_parts += [
-            "  <item>",
-            f"    <title>{title}</title>",
-            f"    <link>{link}</link>",
-            f"    <guid>{link}</guid>",
-            f"    <description>{desc}</description>",
-            "  </item>",
-        ]
-    xml_parts += ["</channel>", "</rss>"]
-    return Response("\n".join(xml_parts), mimetype="application/rss+xml")
-
-
-@bp.route("/healthz")
-@limiter.exempt
-def healthz():
-    return ("ok", 200)
+        item = ET.SubElement(channel, "item")
+        ET.SubElement(item, "title").text = a.title
+        ET.SubElement(item, "link").text = link
+        ET.SubElement(item, "guid").text = link
+        ET.SubElement(item, "description").text = a.snippet[:200] + (
+            "..." if len(a.snippet) > 200 else ""
+        )
+    ET.indent(rss)
+    return ET.tostring(rss, encoding="UTF-8", xml_declaration=True)
 
 
 @bp.get("/search_index.json")
@@ -290,17 +446,22 @@ def healthz():
 def search_index():
     # Lightweight index for Command Palette (excludes draft-tagged articles)
     rows = (
-        Article.query
-        .with_entities(Article.title, Article.slug, Article.tags)
-        .filter(~Article.tags.ilike("%draft%") | (Article.tags == None))
+        Article.query.with_entities(Article.title, Article.slug, Article.tags)
+        .filter(_PUBLISHED)
         .order_by(Article.id.desc())
         .all()
     )
     data = []
     for title, slug, tags in rows:
-        data.append({
-            "title": title,
-            "url": url_for("main.article_by_slug", slug=slug),
-            "tags": [t.strip() for t in (tags.split(",") if tags else []) if t.strip().lower() != "draft"],
-        })
+        data.append(
+            {
+                "title": title,
+                "url": url_for("main.article_by_slug", slug=slug),
+                "tags": [
+                    t.strip()
+                    for t in (tags.split(",") if tags else [])
+                    if t.strip().lower() != "draft"
+                ],
+            }
+        )
     return jsonify(data)
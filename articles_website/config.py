@@ -1,4 +1,5 @@
 import os
+from sqlalchemy.pool import StaticPool
 
 
 def _normalize_db_uri(uri: str) -> str:
@@ -9,12 +10,46 @@ def _normalize_db_uri(uri: str) -> str:
     return uri
 
 
+def engine_options(uri: str) -> dict:
+    """SQLAlchemy engine options for the given database URI."""
+    if uri.startswith("sqlite"):
+        if uri in ("sqlite://", "sqlite:///:memory:"):
+            # One shared connection, otherwise each checkout sees a fresh empty database
+            return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+        return {}
+    # Postgres on Render drops idle connections; ping and recycle instead of erroring.
+    # Hosts that keep connections alive can set DB_POOL_PRE_PING=0 to skip the per-checkout ping.
+    options = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_POOL_OVERFLOW", "20")),
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") == "1",
+    }
+    timeout_ms = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "5000"))
+    if os.getenv("DB_PGBOUNCER", "0") == "1":
+        # Transaction-mode PgBouncer hands each transaction a different server
+        # connection, so psycopg's server-side prepared statements must stay off.
+        # It also rejects the "options" startup parameter: set statement_timeout
+        # on the database role instead.
+        options["connect_args"] = {"prepare_threshold": None}
+    elif timeout_ms > 0:
+        # Bounds a runaway query (e.g. a slow search) instead of letting it hold a connection.
+        # `flask db upgrade` shares this engine; migrations/env.py lifts the limit for its run.
+        options["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+    return options
+
+
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-change-later")
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///site.db")
     SQLALCHEMY_DATABASE_URI = _normalize_db_uri(DATABASE_URL)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     ARTICLES_PER_PAGE = int(os.getenv("ARTICLES_PER_PAGE", "10"))
+    # Seconds a loaded user is reused across requests before re-reading the row
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "30"))
+    # Seconds rendered anonymous pages are kept per worker (0 disables)
+    PAGE_CACHE_TTL = int(os.getenv("PAGE_CACHE_TTL", "300"))
     WTF_CSRF_ENABLED = True
 
 
@@ -26,6 +61,7 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     WTF_CSRF_ENABLED = False
+    RATELIMIT_ENABLED = False
 
 
 class ProductionConfig(Config):
@@ -33,3 +69,11 @@ class ProductionConfig(Config):
     SESSION_COOKIE_SECURE = True
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = "Lax"
+    TEMPLATES_AUTO_RELOAD = False
+    # Compiled templates shared by all workers on the host and kept across restarts.
+    # Without a directory, Jinja uses its own per-user 0700 dir under the temp dir and
+    # refuses one owned by someone else (the cache holds code the app executes).
+    JINJA_BYTECODE_CACHE = True
+    JINJA_BYTECODE_CACHE_DIR = os.getenv("JINJA_BYTECODE_CACHE_DIR")
+    # Load every template at startup so no request pays for parsing one
+    JINJA_PREWARM = True
@@ -1,38 +1,58 @@
 import re
-from functools import wraps
-from typing import Optional
+import threading
+from functools import lru_cache, wraps
+from typing import Optional, Union
 from unicodedata import normalize
 from flask import abort
 from flask_login import login_required, current_user
-from .models import Article
+from sqlalchemy import or_
+from .extensions import db
+from .models import Article, Tag
 
-# New: Markdown rendering and HTML sanitization
-import markdown
-from markdown.extensions.codehilite import CodeHiliteExtension
+# New: Markdown rendering and HTML sanitization (markdown itself is imported lazily in _markdown)
 import bleach
 from markupsafe import Markup, escape
 import math
 
+# ASCII characters slugify() drops (anything but word chars, whitespace and "-")
+_SLUG_STRIP = re.compile(r"[^\w\s-]")
+_SLUG_DELETE = str.maketrans({chr(c): None for c in range(128) if _SLUG_STRIP.match(chr(c))})
+_SLUG_DASH = re.compile(r"[-\s]+")
+
 
 def slugify(text: str) -> str:
-    text = normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
-    text = re.sub(r"[^\w\s-]", "", text).strip().lower()
-    text = re.sub(r"[-\s]+", "-", text)
+    if not text.isascii():
+        text = normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    # Text is ASCII here, so a translate table replaces the strip regex
+    text = text.translate(_SLUG_DELETE).strip().lower()
+    text = _SLUG_DASH.sub("-", text)
     return text or "post"
 
 
+def escape_like(text: str) -> str:
+    """Escape LIKE/ILIKE wildcards in `text`; pair with escape="\\" on the comparison."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
 def unique_slug(title: str, existing_id: Optional[int] = None) -> str:
+    """Return slugify(title), suffixed with -2, -3, ... if already taken.
+
+    Fetches every colliding slug in one query and picks the suffix in Python.
+    """
     base = slugify(title)
-    slug = base
+    # "_" survives slugify() (\w matches it) and is a LIKE wildcard
+    q = db.session.query(Article.slug).filter(
+        or_(Article.slug == base, Article.slug.like(f"{escape_like(base)}-%", escape="\\"))
+    )
+    if existing_id:
+        q = q.filter(Article.id != existing_id)
+    taken = {slug for (slug,) in q}
+    if base not in taken:
+        return base
     n = 2
-    while True:
-        q = Article.query.filter_by(slug=slug)
-        if existing_id:
-            q = q.filter(Article.id != existing_id)
-        if q.first() is None:
-            return slug
-        slug = f"{base}-{n}"
+    while f"{base}-{n}" in taken:
         n += 1
+    return f"{base}-{n}"
 
 
 def normalize_tags(tags: Optional[str]) -> str:
@@ -50,6 +70,16 @@ def normalize_tags(tags: Optional[str]) -> str:
     return ", ".join(result)
 
 
+def sync_tags(article: Article) -> None:
+    """Point article.tags_rel at the Tag rows named in its (normalized) tags string.
+
+    Existing tags are fetched in one query; missing ones are created.
+    """
+    names = [t.strip() for t in article.tags.split(",") if t.strip()] if article.tags else []
+    existing = {t.name: t for t in Tag.query.filter(Tag.name.in_(names))} if names else {}
+    article.tags_rel = [existing.get(name) or Tag(name=name) for name in names]
+
+
 def tags_contains_draft(tags: Optional[str]) -> bool:
     """Return True if the special tag 'draft' is present in the comma-separated tags string."""
     if not tags:
@@ -94,58 +124,110 @@ _ALLOWED_ATTRS = {
 _ALLOWED_PROTOCOLS = ["http", "https", "mailto"]
 
 
+_render_local = threading.local()
+
+
+def _markdown():
+    """Per-thread Markdown instance: reusable via reset(), but not thread-safe.
+
+    Markdown and its codehilite extension (which pulls in Pygments) are imported on
+    first use, since only admin writes render; workers that just serve reads skip them.
+    """
+    md = getattr(_render_local, "md", None)
+    if md is None:
+        import markdown
+        from markdown.extensions.codehilite import CodeHiliteExtension
+
+        md = _render_local.md = markdown.Markdown(
+            extensions=["fenced_code", CodeHiliteExtension(linenums=False)],
+        )
+    return md
+
+
+def _cleaner() -> bleach.sanitizer.Cleaner:
+    """Per-thread Bleach Cleaner, built once rather than on every bleach.clean() call.
+
+    Cleaners hold parser state, so like Markdown instances they are not shared across threads.
+    """
+    cleaner = getattr(_render_local, "cleaner", None)
+    if cleaner is None:
+        cleaner = _render_local.cleaner = bleach.sanitizer.Cleaner(
+            tags=_ALLOWED_TAGS,
+            attributes=_ALLOWED_ATTRS,
+            protocols=_ALLOWED_PROTOCOLS,
+            strip=True,
+        )
+    return cleaner
+
+
 def render_markdown_safe(text: str) -> str:
     """Render Markdown to HTML and sanitize via Bleach.
 
     Keeps fenced code blocks with Pygments (codehilite), headings (h2/h3), links, lists, etc.
     """
-    html = markdown.markdown(
-        text or "",
-        extensions=["fenced_code", CodeHiliteExtension(linenums=False)],
-    )
-    cleaned = bleach.clean(
-        html,
-        tags=_ALLOWED_TAGS,
-        attributes=_ALLOWED_ATTRS,
-        protocols=_ALLOWED_PROTOCOLS,
-        strip=True,
-    )
-    return cleaned
+    html = _markdown().reset().convert(text or "")
+    return _cleaner().clean(html)
+
+
+@lru_cache(maxsize=64)
+def _highlight_pattern(query: str) -> Optional[re.Pattern]:
+    """Compiled matcher for the query's words, shared by every result card of a search."""
+    words = [w for w in re.split(r"\s+", query.strip()) if w]
+    if not words:
+        return None
+    return re.compile("|".join(re.escape(w) for w in words), re.IGNORECASE)
 
 
 def highlight(text: str, query: str) -> Markup:
     """Highlight occurrences of query terms in text using <mark> safely.
 
-    - Escapes the text first to prevent XSS.
+    - Matches against the raw text, then escapes each piece, so a term like "amp"
+      never lands inside an entity such as "&amp;".
     - Case-insensitive match on whitespace-separated tokens.
     - Returns Markup so Jinja won't re-escape the <mark> tags.
     """
     if not text or not query:
         return Markup(escape(text or ""))
-    escaped = escape(text)
-    # Build regex for any of the query words
-    words = [w for w in re.split(r"\s+", query.strip()) if w]
-    if not words:
-        return Markup(escaped)
-    pattern = re.compile(r"(" + "|".join(re.escape(w) for w in words) + r")", re.IGNORECASE)
+    pattern = _highlight_pattern(query)
+    if pattern is None:
+        return Markup(escape(text))
+    parts = []
+    end = 0
+    for match in pattern.finditer(text):
+        parts.append(escape(text[end : match.start()]))
+        parts.append(Markup("<mark>%s</mark>") % match.group(0))
+        end = match.end()
+    parts.append(escape(text[end:]))
+    return Markup("").join(parts)
+
+
+def count_words(text: Optional[str]) -> int:
+    return len(re.findall(r"\w+", text)) if text else 0
 
-    def _repl(m: re.Match) -> str:
-        return f"<mark>{m.group(0)}</mark>"
 
-    result = pattern.sub(_repl, str(escaped))
-    return Markup(result)
+def excerpt(text: Optional[str], length: int = 180) -> str:
+    """First `length` characters of `text`, with '...' when it was cut."""
+    text = text or ""
+    return text[:length] + ("..." if len(text) > length else "")
 
 
-def reading_time(text: Optional[str]) -> str:
-    """Rudimentary reading time at ~200 wpm; returns e.g. '5 min read'."""
-    if not text:
-        return "1 min read"
-    # Count words
-    words = len(re.findall(r"\w+", text))
+def reading_time(text: Union[str, int, None]) -> str:
+    """Rudimentary reading time at ~200 wpm; returns e.g. '5 min read'.
+
+    Accepts the text itself or a precomputed word count (Article.word_count).
+    """
+    words = text if isinstance(text, int) else count_words(text)
     minutes = max(1, math.ceil(words / 200.0))
     return f"{minutes} min read"
 
 
+def render_body(article: Article) -> None:
+    """Fill the columns derived from article.body (sanitized HTML, word count, excerpt)."""
+    article.body_html = render_markdown_safe(article.body)
+    article.word_count = count_words(article.body)
+    article.body_excerpt = excerpt(article.body)
+
+
 def admin_required(f):
     @wraps(f)
     @login_required
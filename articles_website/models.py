@@ -1,15 +1,116 @@
 from __future__ import annotations
-from werkzeug.security import generate_password_hash, check_password_hash
+import secrets
+from datetime import datetime, timezone
+from functools import lru_cache
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from werkzeug.security import check_password_hash
 from flask_login import UserMixin
+from sqlalchemy import DDL, event, update
 from .extensions import db
 
+# Argon2id, tuned to stay well under ~500ms per hash on a small instance
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+
+
+@lru_cache(maxsize=1)
+def _dummy_password_hash() -> str:
+    return _password_hasher.hash(secrets.token_urlsafe())
+
+
+def _utcnow() -> datetime:
+    # Naive UTC with microseconds; CURRENT_TIMESTAMP is only second-precise on SQLite
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+article_tags = db.Table(
+    "article_tags",
+    db.Column("article_id", db.Integer, db.ForeignKey("article.id"), primary_key=True),
+    db.Column("tag_id", db.Integer, db.ForeignKey("tag.id"), primary_key=True),
+    # The primary key leads with article_id; tag pages look rows up by tag_id
+    db.Index("ix_article_tags_tag_id", "tag_id"),
+)
+
 
 class Article(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     body = db.Column(db.Text, nullable=False)
+    # Sanitized HTML rendered from `body` at write time; NULL for rows not yet rendered
+    body_html = db.Column(db.Text)
+    # Lets listings show reading time without loading `body`
+    word_count = db.Column(db.Integer)
+    # Search-result preview, so listings never need to load `body`
+    body_excerpt = db.Column(db.String(300))
     tags = db.Column(db.String(255))
     slug = db.Column(db.String(255), unique=True, nullable=False)
+    cover_image = db.Column(db.String(255))
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=_utcnow, onupdate=_utcnow, server_default=db.func.now()
+    )
+    # Normalized copy of `tags` used for indexed lookups; `tags` stays the display string
+    tags_rel = db.relationship("Tag", secondary=article_tags, back_populates="articles")
+
+    __table_args__ = (
+        # Lets Postgres serve unique_slug's "slug LIKE 'base-%'" prefix scan from an index;
+        # elsewhere it would only duplicate the unique constraint's index on slug
+        db.Index(
+            "ix_article_slug_pattern", "slug", postgresql_ops={"slug": "text_pattern_ops"}
+        ).ddl_if(dialect="postgresql"),
+        # Covers the listing cards (ORDER BY id DESC) so Postgres can answer them index-only
+        db.Index(
+            "ix_article_id_desc_cover",
+            id.desc(),
+            postgresql_include=["title", "slug", "tags", "word_count"],
+        ),
+        # pg_trgm lets Postgres serve search's title/body ILIKE '%q%' from indexes
+        db.Index(
+            "ix_article_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        db.Index(
+            "ix_article_body_trgm",
+            "body",
+            postgresql_using="gin",
+            postgresql_ops={"body": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+class ListingVersion(db.Model):
+    # One row, bumped on every article create, edit and delete. Listing ETags and
+    # page-cache keys read it by primary key instead of aggregating over `article`
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=_utcnow)
+
+
+event.listen(
+    ListingVersion.__table__,
+    "after_create",
+    DDL("INSERT INTO listing_version (id, version, updated_at) VALUES (1, 0, CURRENT_TIMESTAMP)"),
+)
+
+
+@event.listens_for(db.session, "before_flush")
+def _bump_listing_version(session, flush_context, instances):
+    touched = [*session.new, *session.deleted] + [
+        obj for obj in session.dirty if session.is_modified(obj)
+    ]
+    if any(isinstance(obj, Article) for obj in touched):
+        session.connection().execute(
+            update(ListingVersion.__table__)
+            .where(ListingVersion.id == 1)
+            .values(version=ListingVersion.version + 1, updated_at=_utcnow())
+        )
+
+
+class Tag(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), unique=True, nullable=False)
+    articles = db.relationship("Article", secondary=article_tags, back_populates="tags_rel")
 
 
 class User(db.Model, UserMixin):
@@ -18,8 +119,34 @@ class User(db.Model, UserMixin):
     password_hash = db.Column(db.String(255), nullable=False)
     is_admin = db.Column(db.Boolean, nullable=False, default=False)
 
+    __table_args__ = (
+        # Case-insensitive uniqueness; also serves the lower(email) lookup in login
+        db.Index("ix_user_email_lower", db.func.lower(email), unique=True),
+    )
+
     def set_password(self, password: str):
-        self.password_hash = generate_password_hash(password, method="pbkdf2:sha256")
+        self.password_hash = _password_hasher.hash(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        if not self.password_hash.startswith("$argon2"):
+            # Legacy Werkzeug hash (pbkdf2:sha256); replaced on next login
+            return check_password_hash(self.password_hash, password)
+        try:
+            return _password_hasher.verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    @staticmethod
+    def check_missing_password(password: str) -> bool:
+        """Spend a real Argon2 verify, then fail: unknown emails take as long as wrong passwords."""
+        try:
+            _password_hasher.verify(_dummy_password_hash(), password)
+        except (VerificationError, InvalidHashError):
+            pass
+        return False
+
+    def password_needs_rehash(self) -> bool:
+        """True for legacy hashes and Argon2 hashes made with outdated parameters."""
+        if not self.password_hash.startswith("$argon2"):
+            return True
+        return _password_hasher.check_needs_rehash(self.password_hash)
@@ -104,6 +104,10 @@ def run_migrations_online():
         )
 
         with context.begin_transaction():
+            if connection.dialect.name == 'postgresql':
+                # The app engine caps statements at DB_STATEMENT_TIMEOUT_MS; index
+                # builds and data backfills need longer, so lift it for this run
+                connection.exec_driver_sql('SET LOCAL statement_timeout = 0')
             context.run_migrations()
 
 
@@ -0,0 +1,36 @@
+"""
+Render body_html for articles saved before it existed
+
+Revision ID: a2d5
+Revises: f1c2
+Create Date: 2026-10-15
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'a2d5'
+down_revision = 'f1c2'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Same renderer the admin views use, so stored HTML matches newly saved articles
+    from sqlalchemy.sql import table, column, select
+    from sqlalchemy import Integer, Text
+    from articles_website.helpers import render_markdown_safe
+    connection = op.get_bind()
+    article_table = table('article', column('id', Integer), column('body', Text), column('body_html', Text))
+    rows = connection.execute(
+        select(article_table.c.id, article_table.c.body).where(article_table.c.body_html.is_(None))
+    ).fetchall()
+    for row in rows:
+        connection.execute(
+            article_table.update()
+            .where(article_table.c.id == row.id)
+            .values(body_html=render_markdown_safe(row.body))
+        )
+
+
+def downgrade():
+    # Data-only migration: rendered HTML is derived from body, nothing to undo
+    pass
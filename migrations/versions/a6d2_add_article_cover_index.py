@@ -0,0 +1,27 @@
+"""
+Add covering index for article listings
+
+Revision ID: a6d2
+Revises: f5b3
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a6d2'
+down_revision = 'f5b3'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index(
+        'ix_article_id_desc_cover',
+        'article',
+        [sa.text('id DESC')],
+        postgresql_include=['title', 'slug', 'tags', 'word_count'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_article_id_desc_cover', table_name='article')
@@ -0,0 +1,32 @@
+"""
+Add pg_trgm GIN index on Article.title (Postgres only)
+
+Revision ID: b3e8
+Revises: a2d5
+Create Date: 2026-10-15
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'b3e8'
+down_revision = 'a2d5'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_article_title_trgm',
+        'article',
+        ['title'],
+        postgresql_using='gin',
+        postgresql_ops={'title': 'gin_trgm_ops'},
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_article_title_trgm', table_name='article')
@@ -0,0 +1,22 @@
+"""
+Add unique index on lower(user.email)
+
+Revision ID: b7c1
+Revises: a6d2
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b7c1'
+down_revision = 'a6d2'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_user_email_lower', 'user', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_user_email_lower', table_name='user')
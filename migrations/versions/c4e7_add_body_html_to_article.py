@@ -0,0 +1,24 @@
+"""
+Add body_html to Article
+
+Revision ID: c4e7
+Revises: 9b1a
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c4e7'
+down_revision = '9b1a'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('article', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('body_html', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('article', schema=None) as batch_op:
+        batch_op.drop_column('body_html')
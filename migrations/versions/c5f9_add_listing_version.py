@@ -0,0 +1,31 @@
+"""
+Add single-row listing_version table for listing ETags and cache keys
+
+Revision ID: c5f9
+Revises: b3e8
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c5f9'
+down_revision = 'b3e8'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    listing_version = op.create_table(
+        'listing_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute(
+        listing_version.insert().values(id=1, version=0, updated_at=sa.func.now())
+    )
+
+
+def downgrade():
+    op.drop_table('listing_version')
@@ -0,0 +1,26 @@
+"""
+Add updated_at to Article
+
+Revision ID: c9e4
+Revises: b7c1
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c9e4'
+down_revision = 'b7c1'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('article', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now())
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('article', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
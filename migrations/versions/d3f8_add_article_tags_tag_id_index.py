@@ -0,0 +1,21 @@
+"""
+Add index on article_tags.tag_id
+
+Revision ID: d3f8
+Revises: c9e4
+Create Date: 2026-10-15
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'd3f8'
+down_revision = 'c9e4'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_article_tags_tag_id', 'article_tags', ['tag_id'])
+
+
+def downgrade():
+    op.drop_index('ix_article_tags_tag_id', table_name='article_tags')
@@ -0,0 +1,30 @@
+"""
+Add text_pattern_ops index on Article.slug (Postgres only)
+
+Revision ID: d81f
+Revises: c4e7
+Create Date: 2026-10-15
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'd81f'
+down_revision = 'c4e7'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.create_index(
+        'ix_article_slug_pattern',
+        'article',
+        ['slug'],
+        postgresql_ops={'slug': 'text_pattern_ops'},
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_article_slug_pattern', table_name='article')
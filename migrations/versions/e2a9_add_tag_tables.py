@@ -0,0 +1,57 @@
+"""
+Add Tag and article_tags tables
+
+Revision ID: e2a9
+Revises: d81f
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e2a9'
+down_revision = 'd81f'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('tag',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('article_tags',
+    sa.Column('article_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['article_id'], ['article.id']),
+    sa.ForeignKeyConstraint(['tag_id'], ['tag.id']),
+    sa.PrimaryKeyConstraint('article_id', 'tag_id')
+    )
+
+    # Populate from the existing comma-separated article.tags strings
+    from sqlalchemy.sql import table, column, select
+    from sqlalchemy import String, Integer
+    connection = op.get_bind()
+    article_table = table('article', column('id', Integer), column('tags', String))
+    tag_table = table('tag', column('id', Integer), column('name', String))
+    link_table = table('article_tags', column('article_id', Integer), column('tag_id', Integer))
+    tag_ids = {}
+    for row in connection.execute(select(article_table.c.id, article_table.c.tags)).fetchall():
+        names = []
+        for raw in (row.tags or '').split(','):
+            name = raw.strip().lower()
+            if name and name not in names:
+                names.append(name)
+        for name in names:
+            if name not in tag_ids:
+                connection.execute(tag_table.insert().values(name=name))
+                tag_ids[name] = connection.execute(
+                    select(tag_table.c.id).where(tag_table.c.name == name)
+                ).scalar_one()
+            connection.execute(link_table.insert().values(article_id=row.id, tag_id=tag_ids[name]))
+
+
+def downgrade():
+    op.drop_table('article_tags')
+    op.drop_table('tag')
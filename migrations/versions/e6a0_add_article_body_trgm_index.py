@@ -0,0 +1,32 @@
+"""
+Add pg_trgm GIN index on Article.body (Postgres only)
+
+Revision ID: e6a0
+Revises: d3f8
+Create Date: 2026-10-15
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e6a0'
+down_revision = 'd3f8'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_article_body_trgm',
+        'article',
+        ['body'],
+        postgresql_using='gin',
+        postgresql_ops={'body': 'gin_trgm_ops'},
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_article_body_trgm', table_name='article')
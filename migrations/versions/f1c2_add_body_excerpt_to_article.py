@@ -0,0 +1,37 @@
+"""
+Add body_excerpt to Article
+
+Revision ID: f1c2
+Revises: e6a0
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f1c2'
+down_revision = 'e6a0'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('article', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('body_excerpt', sa.String(length=300), nullable=True))
+
+    # Populate for existing rows (same rule as helpers.excerpt)
+    from sqlalchemy.sql import table, column, select
+    from sqlalchemy import Integer, String, Text
+    connection = op.get_bind()
+    article_table = table('article', column('id', Integer), column('body', Text), column('body_excerpt', String))
+    for row in connection.execute(select(article_table.c.id, article_table.c.body)).fetchall():
+        body = row.body or ""
+        connection.execute(
+            article_table.update()
+            .where(article_table.c.id == row.id)
+            .values(body_excerpt=body[:180] + ("..." if len(body) > 180 else ""))
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('article', schema=None) as batch_op:
+        batch_op.drop_column('body_excerpt')
@@ -0,0 +1,37 @@
+"""
+Add word_count to Article
+
+Revision ID: f5b3
+Revises: e2a9
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f5b3'
+down_revision = 'e2a9'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('article', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('word_count', sa.Integer(), nullable=True))
+
+    # Populate for existing rows (same rule as helpers.count_words)
+    from sqlalchemy.sql import table, column, select
+    from sqlalchemy import Integer, Text
+    import re
+    connection = op.get_bind()
+    article_table = table('article', column('id', Integer), column('body', Text), column('word_count', Integer))
+    for row in connection.execute(select(article_table.c.id, article_table.c.body)).fetchall():
+        connection.execute(
+            article_table.update()
+            .where(article_table.c.id == row.id)
+            .values(word_count=len(re.findall(r"\w+", row.body or "")))
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('article', schema=None) as batch_op:
+        batch_op.drop_column('word_count')
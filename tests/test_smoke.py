@@ -1,16 +1,22 @@
 import os
+import re
 import tempfile
+from contextlib import contextmanager
 import pytest
+from sqlalchemy import event
 from articles_website import create_app
+from articles_website.config import TestingConfig
 
 
 @pytest.fixture()
-def app():
+def app(monkeypatch):
     os.environ.setdefault("SECRET_KEY", "test-secret")
     os.environ["FLASK_CONFIG"] = "TestingConfig"
-    # Use a temporary file-based SQLite DB to avoid in-memory connection issues in tests
+    # Use a temporary file-based SQLite DB to avoid in-memory connection issues in tests.
+    # Config reads DATABASE_URL at import time, so patch the resolved URI directly.
     with tempfile.TemporaryDirectory() as tmpdir:
-        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'test.db')}"
+        db_uri = f"sqlite:///{os.path.join(tmpdir, 'test.db')}"
+        monkeypatch.setattr(TestingConfig, "SQLALCHEMY_DATABASE_URI", db_uri)
         os.environ.setdefault("ARTICLES_PER_PAGE", "5")
         app = create_app()
         app.config.update(TESTING=True)
@@ -27,6 +33,49 @@ def client(app):
     return app.test_client()
 
 
+@pytest.fixture()
+def admin_client(app, client):
+    from articles_website.extensions import db
+    from articles_website.models import User
+
+    user = User(email="admin@example.com", is_admin=True)
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.commit()
+    client.post("/login", data={"email": "admin@example.com", "password": "secret123"})
+    return client
+
+
+@pytest.fixture()
+def make_article(app):
+    from articles_website.extensions import db
+    from articles_website.models import Article
+
+    def _make(title, slug, **fields):
+        article = Article(title=title, slug=slug, **{"body": "x", **fields})
+        db.session.add(article)
+        db.session.commit()
+        return article
+
+    return _make
+
+
+@contextmanager
+def count_queries(app):
+    from articles_website.extensions import db
+
+    statements = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _before_cursor_execute)
+
+
 def test_home_ok(client):
     res = client.get("/")
     assert res.status_code == 200
@@ -52,5 +101,353 @@ def test_tags_page_ok_empty(client):
     assert res.status_code == 200
 
 
+def test_create_persists_rendered_body(app, admin_client):
+    from articles_website.models import Article
+
+    res = admin_client.post(
+        "/create", data={"title": "Hello", "tags": "", "body": "# Hi\n\n**bold**"}
+    )
+    assert res.status_code == 302
+    article = Article.query.filter_by(slug="hello").one()
+    assert "<strong>bold</strong>" in article.body_html
+
+
+def test_article_detail_renders_legacy_row(app, make_article, client):
+    from articles_website.models import Article
+
+    make_article("Legacy", "legacy", body="*old*")
+    res = client.get("/a/legacy")
+    assert res.status_code == 200
+    assert b"<em>old</em>" in res.data
+    assert Article.query.filter_by(slug="legacy").one().body_html is not None
+
+
+def test_unique_slug_picks_next_free_suffix(app, make_article):
+    from articles_website.helpers import unique_slug
+    from articles_website.models import Article
+
+    for slug in ("my_post", "my_post-2", "my_post-3", "myxpost-4"):
+        make_article("My_post", slug)
+    assert unique_slug("My_post") == "my_post-4"
+    assert unique_slug("Other") == "other"
+    existing = Article.query.filter_by(slug="my_post").one()
+    assert unique_slug("My_post", existing_id=existing.id) == "my_post"
+
+
+def test_by_tag_matches_whole_tags_only(app, admin_client):
+    admin_client.post("/create", data={"title": "Snake", "tags": "Python, web", "body": "x"})
+    res = admin_client.get("/tags/python")
+    assert b"Snake" in res.data
+    res = admin_client.get("/tags/py")
+    assert b"Snake" not in res.data
+
+
+def test_tag_pager_keeps_clashing_query_args(app, admin_client):
+    admin_client.post("/create", data={"title": "One", "tags": "python", "body": "x"})
+    admin_client.post("/create", data={"title": "Two", "tags": "python", "body": "x"})
+    res = admin_client.get("/tags/python?tag=x&per_page=1")
+    assert res.status_code == 200
+    assert b"/tags/python?tag=x&amp;per_page=1&amp;after_id=" in res.data
+
+
+def test_hot_endpoints_query_counts(app, make_article, client):
+    for i in range(3):
+        make_article(f"Post {i}", f"post-{i}", body_html="<p>x</p>", word_count=1)
+    # home/articles: one aggregate for the ETag, then the listing itself
+    with count_queries(app) as statements:
+        client.get("/")
+    assert len(statements) == 2
+    assert not re.search(r"\barticle_body\b", statements[1])
+    with count_queries(app) as statements:
+        client.get("/articles")
+    assert len(statements) == 2
+    with count_queries(app) as statements:
+        client.get("/a/post-0")
+    assert len(statements) == 1
+
+
+def test_conditional_get_returns_304_until_article_changes(app, admin_client, client):
+    from articles_website.extensions import db
+    from articles_website.models import Article
+
+    admin_client.post("/create", data={"title": "Etag", "tags": "", "body": "v1"})
+    client.get("/logout")
+    for url in ("/", "/articles", "/a/etag"):
+        etag = client.get(url).headers["ETag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    article = Article.query.filter_by(slug="etag").one()
+    article.body = "v2"
+    db.session.commit()
+    assert client.get("/a/etag", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_login_upgrades_legacy_pbkdf2_hash(app, client):
+    from werkzeug.security import generate_password_hash
+    from articles_website.extensions import db
+    from articles_website.models import User
+
+    user = User(email="old@example.com")
+    user.password_hash = generate_password_hash("secret123", method="pbkdf2:sha256")
+    db.session.add(user)
+    db.session.commit()
+    res = client.post("/login", data={"email": "old@example.com", "password": "secret123"})
+    assert res.status_code == 302
+    assert user.password_hash.startswith("$argon2id$")
+    assert user.check_password("secret123")
+    assert not user.check_password("wrong")
+
+
+def test_edit_keeps_slug_when_title_unchanged(app, admin_client):
+    from articles_website.models import Article
+
+    admin_client.post("/create", data={"title": "Same", "tags": "", "body": "one"})
+    article = Article.query.filter_by(slug="same").one()
+    res = admin_client.post(
+        f"/edit/{article.id}", data={"title": "Same", "tags": "", "body": "two"}
+    )
+    assert res.status_code == 302
+    assert article.slug == "same"
+    assert "two" in article.body_html
+    res = admin_client.post(
+        f"/edit/{article.id}", data={"title": "Renamed", "tags": "", "body": "two"}
+    )
+    assert article.slug == "renamed"
+    assert admin_client.get("/edit/9999").status_code == 404
+
+
+def test_create_retries_when_slug_taken_concurrently(app, make_article, admin_client, monkeypatch):
+    from articles_website.blueprints import admin
+    from articles_website.models import Article
+
+    make_article("Race", "race")
+    stale = iter(["race"])
+    real_unique_slug = admin.unique_slug
+    # First call returns the slug another request already committed
+    monkeypatch.setattr(
+        admin, "unique_slug", lambda title, **kw: next(stale, None) or real_unique_slug(title, **kw)
+    )
+    res = admin_client.post("/create", data={"title": "Race", "tags": "go", "body": "y"})
+    assert res.status_code == 302
+    created = Article.query.filter_by(slug="race-2").one()
+    assert [t.name for t in created.tags_rel] == ["go"]
+
+
+def test_register_rejects_duplicate_email_case_insensitively(app, client):
+    from articles_website.models import User
+
+    data = {"email": "dup@example.com", "password": "secret123", "confirm": "secret123"}
+    assert client.post("/register", data=data).status_code == 302
+    client.get("/logout")
+    res = client.post("/register", data={**data, "email": "DUP@example.com"}, follow_redirects=True)
+    assert b"Email is already registered." in res.data
+    assert User.query.count() == 1
+
+
+def test_load_user_reuses_cached_fields(app):
+    from articles_website import load_user
+    from articles_website.extensions import db
+    from articles_website.models import User
+
+    user = User(email="cached@example.com", is_admin=True)
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.commit()
+    user_id = user.id
+    assert load_user(str(user_id)).is_admin
+    db.session.expunge_all()
+    with count_queries(app) as statements:
+        cached = load_user(str(user_id))
+        assert cached.is_admin and cached.email == "cached@example.com"
+    assert statements == []
+
+
+def test_article_detail_streams_and_clears_flash(app, admin_client):
+    res = admin_client.post(
+        "/create", data={"title": "Flashy", "tags": "", "body": "text"}, follow_redirects=True
+    )
+    assert res.is_streamed
+    assert b"Article created!" in res.data
+    assert b"Article created!" not in admin_client.get("/a/flashy").data
+
+
+def test_only_exact_draft_tag_hides_articles(app, admin_client):
+    admin_client.post("/create", data={"title": "Hidden", "tags": "draft", "body": "x"})
+    admin_client.post("/create", data={"title": "Shown", "tags": "drafting", "body": "x"})
+    res = admin_client.get("/articles")
+    assert b"Shown" in res.data
+    assert b"Hidden" not in res.data
+
+
+def test_edit_skips_render_when_body_unchanged(app, admin_client, monkeypatch):
+    from articles_website.blueprints import admin
+    from articles_website.models import Article
+
+    admin_client.post("/create", data={"title": "Cached", "tags": "", "body": "same"})
+    article = Article.query.filter_by(slug="cached").one()
+    calls = []
+    monkeypatch.setattr(admin, "render_body", calls.append)
+    admin_client.post(f"/edit/{article.id}", data={"title": "Cached", "tags": "x", "body": "same"})
+    assert calls == []
+    admin_client.post(f"/edit/{article.id}", data={"title": "Cached", "tags": "x", "body": "new"})
+    assert calls == [article]
+
+
+def test_articles_keyset_pagination(app, make_article, client):
+    for i in range(5):
+        make_article(f"Item {i}", f"item-{i}", word_count=1)
+    res = client.get("/articles?per_page=2")
+    assert b"Item 4" in res.data and b"Item 3" in res.data and b"Item 2" not in res.data
+    assert b"after_id=4" in res.data
+    res = client.get("/articles?per_page=2&after_id=4&partial=1")
+    assert b"Item 2" in res.data and b"Item 1" in res.data and b"Item 3" not in res.data
+    assert b'hx-swap-oob="true"' in res.data and b"after_id=2" in res.data
+    res = client.get("/articles?per_page=2&after_id=2&partial=1")
+    assert b"Item 0" in res.data and b"after_id=" not in res.data
+    # Query args that clash with url_for() parameters stay in the query string
+    res = client.get("/articles?per_page=2&endpoint=z&_external=1")
+    assert b'href="/articles?per_page=2&amp;endpoint=z&amp;_external=1&amp;after_id=4"' in res.data
+    # Legacy page-numbered links still resolve, then continue by cursor
+    res = client.get("/articles?per_page=2&page=2")
+    assert b"Item 2" in res.data and b"Item 3" not in res.data and b"after_id=2" in res.data
+
+
+def test_search_cards_use_stored_excerpt(app, admin_client):
+    admin_client.post(
+        "/create", data={"title": "Long read", "tags": "", "body": "needle " + "y" * 300}
+    )
+    with count_queries(app) as statements:
+        res = admin_client.get("/search?q=needle")
+    assert b"yyy..." in res.data
+    (listing,) = [s for s in statements if "LIKE" in s]
+    assert not re.search(r"\barticle_body\b", listing)
+
+
+def test_anonymous_listing_served_from_page_cache(app, make_article, client):
+    make_article("First", "first", word_count=1)
+    assert b"First" in client.get("/articles").data
+    with count_queries(app) as statements:
+        client.get("/articles")
+    assert len(statements) == 1 and "listing_version" in statements[0]
+    make_article("Second", "second", word_count=1)
+    assert b"Second" in client.get("/articles").data
+
+
+def test_listing_version_bumps_on_article_writes(app, admin_client):
+    from articles_website.extensions import db
+    from articles_website.models import Article, ListingVersion
+
+    def version():
+        return db.session.get(ListingVersion, 1, populate_existing=True).version
+
+    start = version()
+    admin_client.post("/create", data={"title": "Bump", "tags": "", "body": "x"})
+    article = Article.query.filter_by(slug="bump").one()
+    assert version() == start + 1
+    admin_client.post(f"/edit/{article.id}", data={"title": "Bump", "tags": "", "body": "y"})
+    assert version() == start + 2
+    admin_client.post(f"/delete/{article.id}")
+    assert version() == start + 3
+
+
+def test_article_id_url_redirects_to_slug(app, make_article, client):
+    article = make_article("Old link", "old-link")
+    res = client.get(f"/article/{article.id}")
+    assert res.status_code == 302 and res.headers["Location"].endswith("/a/old-link")
+    assert client.get("/article/999").status_code == 404
+
+
+def test_healthz_bypasses_flask(app, client):
+    with count_queries(app) as statements:
+        res = client.get("/healthz")
+    assert res.status_code == 200 and res.data == b"ok"
+    assert statements == [] and "Set-Cookie" not in res.headers
+
+
+def test_login_with_unknown_email_still_runs_argon2(app, client, monkeypatch):
+    from articles_website import models
+
+    calls = []
+    dummy_hash = models._dummy_password_hash
+    monkeypatch.setattr(models, "_dummy_password_hash", lambda: calls.append(1) or dummy_hash())
+    res = client.post("/login", data={"email": "nobody@example.com", "password": "guess"})
+    assert res.status_code == 302 and len(calls) == 1
+
+
+def test_sitemap_is_cached_and_revalidated(app, make_article, client):
+    make_article("Mapped", "mapped", word_count=1)
+    res = client.get("/sitemap.xml")
+    assert b"/a/mapped" in res.data
+    with count_queries(app) as statements:
+        again = client.get("/sitemap.xml")
+    assert again.data == res.data and len(statements) == 1
+    revalidated = client.get("/sitemap.xml", headers={"If-None-Match": res.headers["ETag"]})
+    assert revalidated.status_code == 304
+
+
+def test_tags_index_counts_normalized_tags(app, admin_client):
+    admin_client.post("/create", data={"title": "One", "tags": "Python, web", "body": "x"})
+    admin_client.post("/create", data={"title": "Two", "tags": "python, draft", "body": "x"})
+    res = admin_client.get("/tags")
+    assert res.data.index(b"#python") < res.data.index(b"#web")
+    assert b"#draft" not in res.data
+
+
+def test_search_treats_like_wildcards_literally(app, make_article, client):
+    make_article("Save 50% today", "save", body_excerpt="x")
+    make_article("Top 500 tips", "tips", body_excerpt="x")
+    res = client.get("/search?q=50%25")
+    assert b"today" in res.data and b"tips" not in res.data
+
+
+def test_search_suggest_is_cached(app, make_article, client):
+    make_article("Typeahead", "typeahead")
+    assert b"Typeahead" in client.get("/search/suggest?q=type").data
+    with count_queries(app) as statements:
+        res = client.get("/search/suggest?q=type")
+    assert b"Typeahead" in res.data and len(statements) == 1
+    assert res.headers["Cache-Control"] in ("public, max-age=30", "max-age=30, public")
+
+
+def test_feed_escapes_and_truncates_in_sql(app, make_article, client):
+    make_article("Q&A <live>", "short", body="tiny & neat")
+    make_article("Long", "long", body="z" * 250)
+    with count_queries(app) as statements:
+        res = client.get("/feed.xml")
+    assert b"<title>Q&amp;A &lt;live&gt;</title>" in res.data
+    assert b"tiny &amp; neat</description>" in res.data
+    assert b"z" * 200 + b"...</description>" in res.data and b"z" * 201 not in res.data
+    assert not re.search(r"\barticle_body\b", statements[-1])
+
+
+def test_highlight_marks_escaped_terms():
+    from articles_website.helpers import highlight
+
+    assert str(highlight("Q&A <b> on Flask", "q&a flask")) == (
+        "<mark>Q&amp;A</mark> &lt;b&gt; on <mark>Flask</mark>"
+    )
+    assert str(highlight("Stamp & Co <lt>", "amp lt")) == (
+        "St<mark>amp</mark> &amp; Co &lt;<mark>lt</mark>&gt;"
+    )
+
+
+def test_tag_and_search_listings_revalidate(app, admin_client):
+    admin_client.post("/create", data={"title": "Tagged", "tags": "python", "body": "x"})
+    for url in ("/tags/python", "/search?q=tagged"):
+        res = admin_client.get(url)
+        assert b"Tagged" in res.data and res.headers["ETag"]
+        again = admin_client.get(url, headers={"If-None-Match": res.headers["ETag"]})
+        assert again.status_code == 304
+
+
+def test_article_and_feed_support_head_and_if_modified_since(app, make_article, client):
+    make_article("Polled", "polled", body_html="<p>x</p>")
+    res = client.get("/a/polled")
+    assert res.headers["Last-Modified"]
+    again = client.get("/a/polled", headers={"If-Modified-Since": res.headers["Last-Modified"]})
+    assert again.status_code == 304
+    head = client.head("/feed.xml")
+    assert head.status_code == 200 and head.headers["ETag"] and head.data == b""
+
+
 def test_placeholder():
     assert True